@@ -0,0 +1,66 @@
+import hashlib
+import shelve
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase and collapse whitespace so trivial variants share an answer."""
+    return " ".join(question.lower().split())
+
+
+class AnswerCache:
+    """
+    LRU cache of RAG answers keyed by sha256(namespace + normalized question).
+
+    `namespace` should capture everything that shapes an answer (LLM, prompt,
+    indexed corpus), so stale answers are never served after a change.
+    When `path` is set, answers are also persisted in a shelve database and
+    survive restarts.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 512, path: Optional[str] = None):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.path = path
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    def _key(self, question: str) -> str:
+        text = f"{self.namespace}\0{normalize_question(question)}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, question: str) -> Optional[str]:
+        key = self._key(question)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+            if not self.path:
+                return None
+            with shelve.open(self.path) as db:
+                answer = db.get(key)
+
+            if answer is not None:
+                self._remember(key, answer)
+            return answer
+
+    def put(self, question: str, answer: str) -> None:
+        key = self._key(question)
+        with self._lock:
+            self._remember(key, answer)
+            if self.path:
+                with shelve.open(self.path) as db:
+                    db[key] = answer
+
+    def _remember(self, key: str, answer: str) -> None:
+        self._memory[key] = answer
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
@@ -8,3 +8,14 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
 if not GROQ_API_KEY:
     raise RuntimeError("GROQ_API_KEY is not set. Please add it to your .env file.")
+
+# On-disk caching of the FAISS index (off by default: loading a cached index
+# unpickles the docstore, so only enable it for a cache dir you trust)
+CACHE_DIR = os.getenv("SCHEMASCOPE_CACHE_DIR", ".cache")
+ENABLE_INDEX_CACHE = os.getenv("SCHEMASCOPE_INDEX_CACHE", "0") == "1"
+
+# Scalar quantisation of stored vectors: "int8" (4x smaller), "fp16" or "none"
+INDEX_QUANTIZATION = os.getenv("SCHEMASCOPE_INDEX_QUANTIZATION", "int8")
+
+# Persist chat answers across restarts (in-memory LRU is always on)
+ENABLE_ANSWER_CACHE = os.getenv("SCHEMASCOPE_ANSWER_CACHE", "0") == "1"
@@ -1,16 +1,23 @@
 import sys
 from pathlib import Path
-from typing import List, Optional
+from typing import Optional
 
-import networkx as nx
 from pyvis.network import Network
 
 from src.yaml_loader import load_yaml_entities
-from src.schema_models import SchemaEntity
+from src.schema_models import EntityRegistry
+
+# Node colors by entity type
+NODE_COLORS = {
+    "table": "#1f77b4",  # blue
+    "event": "#ff7f0e",  # orange
+}
+DEFAULT_NODE_COLOR = "#2ca02c"  # green
+FOCUS_NODE_COLOR = "#d62728"  # red
 
 
 def build_lineage_graph(
-    entities: List[SchemaEntity],
+    registry: EntityRegistry,
     focus_entity: Optional[str] = None,
     output_path: str = "lineage.html",
 ) -> None:
@@ -20,51 +27,44 @@ def build_lineage_graph(
     - Edges: upstream -> downstream dependencies
     """
 
-    # Map name -> entity for quick lookup
-    entity_dict = {e.name: e for e in entities}
+    focus_colors = {focus_entity: FOCUS_NODE_COLOR} if focus_entity else {}
 
-    # Build a directed graph
-    G = nx.DiGraph()
+    # Create a PyVis network (nice interactive HTML)
+    net = Network(
+        height="700px",
+        width="100%",
+        directed=True,
+        bgcolor="#111111",
+        font_color="white",
+    )
 
-    # Add nodes
-    for e in entities:
+    # Add nodes (duplicate definitions are already merged in the registry)
+    for e in registry.by_name.values():
         label = f"{e.name}\n({e.entity_type})"
 
-        # Choose color based on type
-        if e.entity_type.lower() == "table":
-            color = "#1f77b4"  # blue
-        elif e.entity_type.lower() == "event":
-            color = "#ff7f0e"  # orange
-        else:
-            color = "#2ca02c"  # green
-
-        # Highlight focus entity
-        if focus_entity and e.name == focus_entity:
-            color = "#d62728"  # red
+        # Focus entity is highlighted, otherwise color by type
+        color = focus_colors.get(e.name) or NODE_COLORS.get(
+            e.entity_type.lower(), DEFAULT_NODE_COLOR
+        )
 
-        G.add_node(
+        net.add_node(
             e.name,
             label=label,
             color=color,
             title=e.raw_text or e.to_document_text(),
+            size=10,
         )
 
-    # Add edges from upstream -> this entity
-    for e in entities:
-        for upstream_name in e.upstream:
-            if upstream_name in entity_dict:
-                G.add_edge(upstream_name, e.name)
-
-    # Create a PyVis network (nice interactive HTML)
-        net = Network(
-        height="700px",
-        width="100%",
-        directed=True,
-        bgcolor="#111111",
-        font_color="white",
+    # Add edges from upstream -> this entity, once each even if an
+    # upstream is listed twice or an entity is defined in several files
+    edges = dict.fromkeys(
+        (upstream_name, e.name)
+        for e in registry.entities
+        for upstream_name in e.upstream
+        if upstream_name in registry.by_name
     )
-
-    net.from_nx(G)
+    for upstream_name, name in edges:
+        net.add_edge(upstream_name, name, width=1)
 
     # Enable slider-like physics for nicer layout
     net.toggle_physics(True)
@@ -79,13 +79,13 @@ def build_lineage_graph(
 
 def main():
     # Load entities from YAML
-    entities = load_yaml_entities("data/schemas")
+    registry = load_yaml_entities("data/schemas")
 
     # Optional: focus entity name from command line
     focus = sys.argv[1] if len(sys.argv) > 1 else None
 
     build_lineage_graph(
-        entities=entities,
+        registry=registry,
         focus_entity=focus,
         output_path="lineage.html",
     )
@@ -0,0 +1,22 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Below this many files, process start-up costs more than parsing serially
+PARALLEL_MIN_FILES = 8
+
+
+def map_files(
+    fn: Callable[[T], R], items: Sequence[T], max_workers: Optional[int] = None
+) -> List[R]:
+    """
+    Apply `fn` to every item, in order. Uses a process pool once there are at
+    least PARALLEL_MIN_FILES items; `max_workers` is passed to the pool.
+    `fn` must be a module-level function so it can be pickled.
+    """
+    if len(items) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(fn, items))
+    return [fn(item) for item in items]
@@ -1,23 +1,25 @@
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_groq import ChatGroq
-
-from langchain_core.documents import Document
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
-
 from src.config import GROQ_API_KEY
 from src.yaml_loader import load_yaml_entities
 
 
 def build_demo_rag_chain():
+    # Heavy imports (LangChain, torch via sentence-transformers, FAISS) are
+    # deferred until a chain is actually built
+    from langchain_groq import ChatGroq
+
+    from langchain_core.documents import Document
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.runnables import RunnablePassthrough
+
+    from src.vector_store import build_vector_store, make_embeddings
+
     # 1. Load SchemaEntity objects from YAML
-    entities = load_yaml_entities("data/schemas")
+    registry = load_yaml_entities("data/schemas")
 
     # 2. Convert them to LangChain Documents
     docs = []
-    for e in entities:
+    for e in registry.entities:
         text = e.raw_text or e.to_document_text()
         docs.append(
             Document(
@@ -30,12 +32,10 @@ def build_demo_rag_chain():
         )
 
     # 3. Free local embeddings
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
+    embeddings = make_embeddings()
 
     # 4. Build FAISS vector store + retriever
-    vectordb = FAISS.from_documents(docs, embeddings)
+    vectordb = build_vector_store(docs, embeddings)
     retriever = vectordb.as_retriever(search_kwargs={"k": 3})
 
     # 5. LLM – Groq
@@ -1,18 +1,48 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from collections import deque
+from dataclasses import dataclass, field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import List, Optional, Dict, Tuple
+
+
+def walk_lineage(start: str, adjacency: Dict[str, List[str]]) -> List[str]:
+    """
+    Iterative breadth-first walk over an adjacency map (name -> neighbour names).
+    Returns every name reachable from `start`, excluding `start` itself.
+    """
+    seen = {start}
+    reached: List[str] = []
+    queue = deque(adjacency.get(start, ()))
+    while queue:
+        name = queue.popleft()
+        if name in seen:
+            continue
+        seen.add(name)
+        reached.append(name)
+        queue.extend(adjacency.get(name, ()))
+    return reached
 
 
 class FieldDef(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     name: str
     type: Optional[str] = None
     required: bool = False
     pii: bool = False
     description: Optional[str] = None
 
+    @field_validator("required", "pii", mode="before")
+    @classmethod
+    def _null_flag_is_false(cls, value):
+        # `required:` with no value in YAML means "not required"
+        return False if value is None else value
+
 
 class SchemaEntity(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     name: str
-    entity_type: str  # "table", "event", "contract"
+    entity_type: str = "table"  # "table", "event", "contract"
     fields: List[FieldDef] = Field(default_factory=list)
 
     # For dependency graph
@@ -22,6 +52,11 @@ class SchemaEntity(BaseModel):
     # For RAG text representation
     raw_text: Optional[str] = None
 
+    @field_validator("fields", "upstream", "downstream", mode="before")
+    @classmethod
+    def _null_list_is_empty(cls, value):
+        return [] if value is None else value
+
     def to_document_text(self) -> str:
         """Convert the entity to a plain text document for embeddings."""
         lines = [f"Entity: {self.name} ({self.entity_type})"]
@@ -44,65 +79,120 @@ class SchemaEntity(BaseModel):
         if self.downstream:
             lines.append(f"Downstream: {', '.join(self.downstream)}")
 
+        # Lineage context block, repeated in prose for better RAG retrieval
+        upstream = ", ".join(self.upstream or ["None"])
+        downstream = ", ".join(self.downstream or ["None"])
+        lines.append(
+            f"\n\nImpact Analysis for {self.name}:\n\n"
+            f"Upstream systems: {upstream}\n"
+            f"Downstream systems: {downstream}\n\n"
+        )
+
         return "\n".join(lines)
 
     # ----------------------------------------------------------------------
     # NEW: Impact Analysis Utilities
     # ----------------------------------------------------------------------
 
-    def get_impacted_entities(self, all_entities: Dict[str, "SchemaEntity"]) -> List["SchemaEntity"]:
+    def get_impacted_entities(self, registry: "EntityRegistry") -> List["SchemaEntity"]:
         """
         Return all entities directly impacted if *this* entity changes.
         This includes immediate upstream and downstream links.
         """
-        impacted = set()
-
-        # Upstream systems affected if this entity changes
-        for u in self.upstream:
-            if u in all_entities:
-                impacted.add(all_entities[u])
+        if registry.by_name.get(self.name) is self:
+            names = registry.impacted_names(self.name)
+        else:
+            # Not part of this registry, so there is no memoized entry for it
+            names = registry.neighbour_names(self.upstream, self.downstream)
 
-        # Downstream systems affected
-        for d in self.downstream:
-            if d in all_entities:
-                impacted.add(all_entities[d])
+        return [registry.by_name[name] for name in names]
 
-        return list(impacted)
-
-    def get_full_lineage(self, all_entities: Dict[str, "SchemaEntity"]) -> Dict[str, List[str]]:
+    def get_full_lineage(self, registry: "EntityRegistry") -> Dict[str, List[str]]:
         """
         Returns full recursive upstream and downstream lineage.
         Useful for drawing lineage graphs or answering complex questions.
         """
-        visited_up = set()
-        visited_down = set()
-
-        # Depth-first traversal
-        def dfs_up(name):
-            if name in visited_up:
-                return
-            visited_up.add(name)
-            ent = all_entities.get(name)
-            if ent:
-                for parent in ent.upstream:
-                    dfs_up(parent)
-
-        def dfs_down(name):
-            if name in visited_down:
-                return
-            visited_down.add(name)
-            ent = all_entities.get(name)
-            if ent:
-                for child in ent.downstream:
-                    dfs_down(child)
-
-        dfs_up(self.name)
-        dfs_down(self.name)
-
-        visited_up.discard(self.name)
-        visited_down.discard(self.name)
-
         return {
-            "full_upstream": list(visited_up),
-            "full_downstream": list(visited_down),
+            "full_upstream": list(registry.full_upstream(self.name)),
+            "full_downstream": list(registry.full_downstream(self.name)),
+        }
+
+
+def _merge_definitions(first: SchemaEntity, other: SchemaEntity) -> SchemaEntity:
+    """
+    Combine two definitions of the same entity: lineage is the union of both,
+    and fields come from the first definition that declares any (e.g. a
+    lineage-only entry generated from SQL never hides the hand-written schema).
+    """
+    base = first if first.fields or not other.fields else other
+    merged = base.model_copy(
+        update={
+            "upstream": list(dict.fromkeys(first.upstream + other.upstream)),
+            "downstream": list(dict.fromkeys(first.downstream + other.downstream)),
         }
+    )
+    merged.raw_text = merged.to_document_text()
+    return merged
+
+
+@dataclass
+class EntityRegistry:
+    """
+    Loaded entities plus everything derived from them once per load:
+    the name index and lineage adjacency maps. Transitive closures and
+    direct impact lists are computed on first request and memoized per name.
+    """
+
+    entities: List[SchemaEntity]
+    by_name: Dict[str, SchemaEntity]
+    upstream: Dict[str, List[str]]
+    downstream: Dict[str, List[str]]
+    upstream_closure: Dict[str, List[str]] = field(default_factory=dict)
+    downstream_closure: Dict[str, List[str]] = field(default_factory=dict)
+    impacted: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def from_entities(cls, entities: List[SchemaEntity]) -> "EntityRegistry":
+        # A name defined in several files is merged into one entity
+        by_name: Dict[str, SchemaEntity] = {}
+        for e in entities:
+            seen = by_name.get(e.name)
+            by_name[e.name] = e if seen is None else _merge_definitions(seen, e)
+
+        upstream = {name: e.upstream for name, e in by_name.items()}
+        downstream = {name: e.downstream for name, e in by_name.items()}
+
+        return cls(
+            entities=entities,
+            by_name=by_name,
+            upstream=upstream,
+            downstream=downstream,
+        )
+
+    def full_upstream(self, name: str) -> List[str]:
+        """All names transitively upstream of `name`."""
+        if name not in self.upstream_closure:
+            self.upstream_closure[name] = walk_lineage(name, self.upstream)
+        return self.upstream_closure[name]
+
+    def full_downstream(self, name: str) -> List[str]:
+        """All names transitively downstream of `name`."""
+        if name not in self.downstream_closure:
+            self.downstream_closure[name] = walk_lineage(name, self.downstream)
+        return self.downstream_closure[name]
+
+    def neighbour_names(
+        self, upstream: List[str], downstream: List[str]
+    ) -> Tuple[str, ...]:
+        """Registered names among `upstream` then `downstream`, without duplicates."""
+        return tuple(
+            dict.fromkeys(n for n in upstream + downstream if n in self.by_name)
+        )
+
+    def impacted_names(self, name: str) -> Tuple[str, ...]:
+        """Registered entities directly upstream or downstream of `name`."""
+        if name not in self.impacted:
+            self.impacted[name] = self.neighbour_names(
+                self.upstream.get(name, []), self.downstream.get(name, [])
+            )
+        return self.impacted[name]
@@ -1,12 +1,19 @@
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, Set, List
+from typing import Dict, Set, List, Optional
 import yaml
 
 import sqlglot
 from sqlglot import exp
+from sqlglot.optimizer.scope import traverse_scope
 
+from src.parallel import map_files
+from src.yaml_compat import SafeDumper
 
-def extract_lineage_from_sql(sql_text: str) -> Dict[str, Set[str]]:
+
+def extract_lineage_from_sql(
+    sql_text: str, dialect: Optional[str] = None
+) -> Dict[str, Set[str]]:
     """
     Very simple lineage extractor.
 
@@ -18,7 +25,7 @@ def extract_lineage_from_sql(sql_text: str) -> Dict[str, Set[str]]:
     lineage: Dict[str, Set[str]] = {}
 
     # Parse SQL into expressions
-    expressions = sqlglot.parse(sql_text)
+    expressions = sqlglot.parse(sql_text, read=dialect)
 
     for expression in expressions:
         # We only handle CREATE VIEW / CREATE TABLE AS SELECT for now
@@ -27,14 +34,16 @@ def extract_lineage_from_sql(sql_text: str) -> Dict[str, Set[str]]:
         ):
             target_table = expression.this.name  # view/table being created
 
-            # find all source tables in the SELECT part
-            # expression.find_all(exp.Table) will include the target itself,
-            # so we filter that out
+            # Collect physical source tables scope by scope; CTE and
+            # subquery sources resolve to nested scopes, not tables
             sources: Set[str] = set()
-            for table in expression.find_all(exp.Table):
-                name = table.name
-                if name and name != target_table:
-                    sources.add(name)
+            if isinstance(expression.expression, exp.Query):
+                for scope in traverse_scope(expression):
+                    for source in scope.sources.values():
+                        if isinstance(source, exp.Table):
+                            name = source.name
+                            if name and name != target_table:
+                                sources.add(name)
 
             if target_table not in lineage:
                 lineage[target_table] = set()
@@ -51,7 +60,7 @@ def build_yaml_entities_from_lineage(
     Convert lineage mapping into YAML 'entities' list.
     We don't infer fields here, only upstream/downstream.
     """
-    # First, build upstream list
+    # Accumulate upstream/downstream as sets, sorted into lists at the end
     entities: Dict[str, dict] = {}
     for target, sources in lineage.items():
         # ensure entity exists
@@ -60,56 +69,72 @@ def build_yaml_entities_from_lineage(
             {
                 "name": target,
                 "entity_type": "view",  # default, you can tweak
-                "upstream": [],
-                "downstream": [],
+                "upstream": set(),
+                "downstream": set(),
                 "fields": [],
             },
         )
-        ent["upstream"] = sorted(list(set(ent["upstream"]).union(sources)))
+        ent["upstream"].update(sources)
 
         # for each source, add downstream info
-        for s in sources:
+        for s in sorted(sources):
             src_ent = entities.setdefault(
                 s,
                 {
                     "name": s,
                     "entity_type": "table",  # guess
-                    "upstream": [],
-                    "downstream": [],
+                    "upstream": set(),
+                    "downstream": set(),
                     "fields": [],
                 },
             )
-            if target not in src_ent["downstream"]:
-                src_ent["downstream"].append(target)
+            src_ent["downstream"].add(target)
+
+    for ent in entities.values():
+        ent["upstream"] = sorted(ent["upstream"])
+        ent["downstream"] = sorted(ent["downstream"])
 
     return list(entities.values())
 
 
 def generate_lineage_yaml_from_folder(
-    sql_folder: str = "sql", output_path: str = "data/schemas/sql_lineage.yml"
+    sql_folder: str = "sql",
+    output_path: str = "data/schemas/sql_lineage.yml",
+    max_workers: Optional[int] = None,
 ) -> None:
     """
     Read all .sql files in a folder, extract simple lineage,
     and write a YAML file compatible with your existing loader.
+
+    Each file is parsed on its own, via src.parallel.map_files.
     """
     base = Path(sql_folder)
-    all_sql = ""
+    # Sorted so entity order in the output does not depend on the filesystem
+    files = sorted(base.glob("*.sql"))
+    sql_texts = [file.read_text(encoding="utf-8") for file in files]
+    sql_texts = [text for text in sql_texts if text.strip()]
 
-    for file in base.glob("*.sql"):
-        all_sql += file.read_text(encoding="utf-8") + "\n"
-
-    if not all_sql.strip():
+    if not sql_texts:
         print("No SQL found in folder:", sql_folder)
         return
 
-    lineage = extract_lineage_from_sql(all_sql)
+    per_file = map_files(extract_lineage_from_sql, sql_texts, max_workers)
+
+    # Merge per-file lineage; a target may be defined across several files
+    lineage: Dict[str, Set[str]] = defaultdict(set)
+    for file_lineage in per_file:
+        for target, sources in file_lineage.items():
+            lineage[target].update(sources)
+
     entities = build_yaml_entities_from_lineage(lineage)
 
     data = {"entities": entities}
 
     out_path = Path(output_path)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(yaml.safe_dump(data, sort_keys=False), encoding="utf-8")
+    out_path.write_text(
+        yaml.dump(data, Dumper=SafeDumper, sort_keys=False), encoding="utf-8"
+    )
 
     print(f"Wrote lineage YAML to {out_path.resolve()}")
 
@@ -11,17 +11,12 @@ import yaml
 from pathlib import Path
 import streamlit.components.v1 as components
 
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_groq import ChatGroq
-from langchain_core.documents import Document
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
-
-from src.config import GROQ_API_KEY
+# LangChain / torch / FAISS are imported inside the cached builders below,
+# so the sidebar and lineage tab render before the RAG stack is loaded
+from src.answer_cache import AnswerCache
+from src.config import CACHE_DIR, ENABLE_ANSWER_CACHE, GROQ_API_KEY
 from src.yaml_loader import load_yaml_entities
-from src.schema_models import SchemaEntity
+from src.schema_models import EntityRegistry, SchemaEntity
 
 
 # --------------------------
@@ -54,16 +49,34 @@ def entity_to_contract_yaml(entity: SchemaEntity) -> str:
 
 
 # --------------------------
-# Build RAG pipeline (cached)
+# Load schemas + build RAG pipeline (cached)
 # --------------------------
 @st.cache_resource
-def get_rag_chain_and_entities():
-    # 1. Load schema entities from YAML
-    entities = load_yaml_entities("data/schemas")
+def get_entities() -> EntityRegistry:
+    return load_yaml_entities("data/schemas")
 
-    # 2. Convert to Documents
+
+@st.cache_resource
+def get_embeddings():
+    # Cached apart from the chain so "Reload schemas" keeps the loaded model
+    from src.vector_store import make_embeddings
+
+    return make_embeddings()
+
+
+@st.cache_resource
+def get_rag_chain(_embeddings, _registry: EntityRegistry):
+    from langchain_groq import ChatGroq
+    from langchain_core.documents import Document
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.runnables import RunnablePassthrough
+    from langchain_core.output_parsers import StrOutputParser
+
+    from src.vector_store import build_vector_store, index_cache_key
+
+    # 1. Convert schema entities to Documents
     docs = []
-    for e in entities:
+    for e in _registry.entities:
         text = e.raw_text or e.to_document_text()
         docs.append(
             Document(
@@ -75,23 +88,18 @@ def get_rag_chain_and_entities():
             )
         )
 
-    # 3. Embeddings (free HF model)
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
-
-    # 4. Vector store + retriever
-    vectordb = FAISS.from_documents(docs, embeddings)
+    # 2. Vector store + retriever (embeddings come from get_embeddings)
+    vectordb = build_vector_store(docs, _embeddings)
     retriever = vectordb.as_retriever(search_kwargs={"k": 4})
 
-    # 5. LLM – Groq
+    # 3. LLM – Groq
     llm = ChatGroq(
         model="llama-3.3-70b-versatile",  # or "llama-3.1-8b-instant"
         api_key=GROQ_API_KEY,
         temperature=0.1,
     )
 
-    # 6. Prompt
+    # 4. Prompt
     prompt = ChatPromptTemplate.from_template(
         """
 You are a data schema and data contract assistant.
@@ -126,7 +134,19 @@ Question: {question}
         | StrOutputParser()
     )
 
-    return rag_chain, entities
+    # 5. Answer cache, namespaced by everything that shapes an answer
+    answer_cache = AnswerCache(
+        namespace="\0".join(
+            [
+                llm.model_name,
+                prompt.messages[0].prompt.template,
+                index_cache_key(docs),
+            ]
+        ),
+        path=str(Path(CACHE_DIR) / "answers") if ENABLE_ANSWER_CACHE else None,
+    )
+
+    return rag_chain, answer_cache
 
 
 # --------------------------
@@ -137,21 +157,22 @@ def main():
 
     st.title("🧠 SchemaScope – Data Contract & Schema Assistant")
 
-    rag_chain, entities = get_rag_chain_and_entities()
+    registry = get_entities()
 
     # ---- Sidebar: Entity browser ----
     st.sidebar.header("📚 Entities")
         # Button to reload YAML schemas and rebuild the RAG stack
     if st.sidebar.button("🔄 Reload schemas"):
-        st.cache_resource.clear()
+        get_entities.clear()
+        get_rag_chain.clear()
         st.rerun()
 
 
 
-    entity_names = [e.name for e in entities]
+    entity_names = list(registry.by_name)
     selected_name = st.sidebar.selectbox("Select an entity", options=entity_names)
 
-    selected_entity = next(e for e in entities if e.name == selected_name)
+    selected_entity = registry.by_name[selected_name]
 
     st.sidebar.subheader("Entity details")
     st.sidebar.markdown(f"**Name:** `{selected_entity.name}`")
@@ -214,10 +235,17 @@ def main():
             with st.chat_message("user"):
                 st.markdown(user_input)
 
-            # Generate answer
+            # Generate answer (the RAG stack is built on the first question)
             with st.chat_message("assistant"):
                 with st.spinner("Thinking..."):
-                    answer = rag_chain.invoke(user_input)
+                    rag_chain, answer_cache = get_rag_chain(get_embeddings(), registry)
+                    answer = answer_cache.get(user_input)
+
+                if answer is None:
+                    # Stream tokens as they arrive; returns the full text
+                    answer = st.write_stream(rag_chain.stream(user_input))
+                    answer_cache.put(user_input, answer)
+                else:
                     st.markdown(answer)
 
             st.session_state.messages.append({"role": "assistant", "content": answer})
@@ -0,0 +1,180 @@
+import hashlib
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.config import CACHE_DIR, ENABLE_INDEX_CACHE, INDEX_QUANTIZATION
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Switch from exact search to an HNSW graph once the corpus is this large
+HNSW_MIN_VECTORS = 512
+HNSW_M = 32
+
+# SCHEMASCOPE_INDEX_QUANTIZATION -> FAISS scalar quantizer ("none" keeps float32)
+QUANTIZER_TYPES = {
+    "none": None,
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+class CachedEmbeddings(HuggingFaceEmbeddings):
+    """
+    HuggingFace embeddings with a per-document vector cache.
+
+    Each vector is stored as <cache_dir>/<sha256(model + text)>.npy, so
+    editing one YAML file only re-embeds the entities whose text changed.
+    Caching is disabled when cache_dir is None.
+    """
+
+    cache_dir: Optional[str] = None
+
+    def _cache_path(self, text: str) -> Path:
+        normalized = self.encode_kwargs.get("normalize_embeddings", False)
+        key = hashlib.sha256(
+            f"{self.model_name}\0{normalized}\0{text}".encode("utf-8")
+        ).hexdigest()
+        return Path(self.cache_dir) / f"{key}.npy"
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.cache_dir is None:
+            return super().embed_documents(texts)
+
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        miss_idx: List[int] = []
+        for i, text in enumerate(texts):
+            path = self._cache_path(text)
+            if path.exists():
+                vectors[i] = np.load(path).tolist()
+            else:
+                miss_idx.append(i)
+
+        if miss_idx:
+            Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
+            miss_vectors = super().embed_documents([texts[i] for i in miss_idx])
+            for i, vec in zip(miss_idx, miss_vectors):
+                np.save(self._cache_path(texts[i]), np.asarray(vec, dtype="float32"))
+                vectors[i] = vec
+
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        # The base class routes queries through embed_documents; skip the
+        # cache so chat questions are never written to disk
+        return super().embed_documents([text])[0]
+
+
+def make_embeddings(model_name: str = EMBEDDING_MODEL) -> CachedEmbeddings:
+    """
+    Create the embedding model on the GPU when one is available, emitting
+    unit-length vectors. The vector cache is on when caching is enabled.
+    """
+    import torch  # installed with sentence-transformers; slow to import
+
+    cache_dir = str(Path(CACHE_DIR) / "emb") if ENABLE_INDEX_CACHE else None
+    return CachedEmbeddings(
+        model_name=model_name,
+        cache_dir=cache_dir,
+        model_kwargs={"device": "cuda" if torch.cuda.is_available() else "cpu"},
+        encode_kwargs={"batch_size": 64, "normalize_embeddings": True},
+    )
+
+
+def _index_spec() -> str:
+    """Describes the index layout, so a cached index built differently is not reused."""
+    return f"ip-{INDEX_QUANTIZATION}"
+
+
+def index_cache_key(docs: List[Document], model_name: str = EMBEDDING_MODEL) -> str:
+    """SHA-256 over the embedding model, index layout and every document's content."""
+    h = hashlib.sha256(f"{model_name}\0{_index_spec()}".encode("utf-8"))
+    h.update(b"\0")
+    h.update("\0".join(d.page_content for d in docs).encode("utf-8"))
+    return h.hexdigest()
+
+
+def build_vector_store(
+    docs: List[Document],
+    embeddings: Embeddings,
+    model_name: str = EMBEDDING_MODEL,
+) -> FAISS:
+    """
+    Build a FAISS vector store for the given documents.
+
+    When SCHEMASCOPE_INDEX_CACHE=1, the index is persisted under
+    <cache dir>/faiss/<content hash> and reloaded on the next start
+    instead of re-embedding every document.
+    """
+    if not ENABLE_INDEX_CACHE:
+        return _embed_and_index(docs, embeddings)
+
+    index_path = Path(CACHE_DIR) / "faiss" / index_cache_key(docs, model_name)
+    if index_path.exists():
+        return FAISS.load_local(
+            str(index_path),
+            embeddings,
+            allow_dangerous_deserialization=True,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+        )
+
+    vectordb = _embed_and_index(docs, embeddings)
+    vectordb.save_local(str(index_path))
+    return vectordb
+
+
+def _new_index(dim: int, count: int) -> faiss.Index:
+    """
+    Exact search for small corpora, HNSW (log-time queries) for large ones.
+    Vectors are unit-normalised, so inner product is cosine similarity, and
+    are stored scalar-quantised unless quantisation is set to "none".
+    """
+    if INDEX_QUANTIZATION not in QUANTIZER_TYPES:
+        raise ValueError(
+            f"Unknown SCHEMASCOPE_INDEX_QUANTIZATION {INDEX_QUANTIZATION!r}; "
+            f"expected one of {', '.join(QUANTIZER_TYPES)}"
+        )
+    qtype = QUANTIZER_TYPES[INDEX_QUANTIZATION]
+    metric = faiss.METRIC_INNER_PRODUCT
+
+    if count >= HNSW_MIN_VECTORS:
+        if qtype is None:
+            return faiss.IndexHNSWFlat(dim, HNSW_M, metric)
+        return faiss.IndexHNSWSQ(dim, qtype, HNSW_M, metric)
+
+    if qtype is None:
+        return faiss.IndexFlatIP(dim)
+    return faiss.IndexScalarQuantizer(dim, qtype, metric)
+
+
+def _embed_and_index(docs: List[Document], embeddings: Embeddings) -> FAISS:
+    # Embed explicitly so CachedEmbeddings can serve unchanged documents from disk
+    texts = [d.page_content for d in docs]
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype="float32")
+    faiss.normalize_L2(vectors)
+
+    index = _new_index(vectors.shape[1], len(docs))
+    if not index.is_trained:
+        # Quantizers learn per-dimension value ranges from the corpus itself
+        index.train(vectors)
+    index.add(vectors)
+
+    ids = [str(uuid.uuid4()) for _ in docs]
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(dict(zip(ids, docs))),
+        index_to_docstore_id=dict(enumerate(ids)),
+        # make_embeddings normalises queries too; for other embeddings the
+        # query norm only scales scores, it never changes the ranking
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+    )
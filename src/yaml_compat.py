@@ -0,0 +1,9 @@
+"""PyYAML loader/dumper classes, using the libyaml C bindings when available."""
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
+__all__ = ["SafeDumper", "SafeLoader"]
@@ -1,67 +1,51 @@
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Optional
 import yaml
 
-from src.schema_models import SchemaEntity, FieldDef
+from src.parallel import map_files
+from src.schema_models import EntityRegistry, SchemaEntity
+from src.yaml_compat import SafeLoader
 
 
-def load_yaml_entities(path: str = "data/schemas") -> List[SchemaEntity]:
-    """Load all SchemaEntity objects from YAML files in the given folder."""
-    base = Path(path)
-    entities: List[SchemaEntity] = []
-
-    # Load all YAML definitions
-    for file in base.glob("*.yml"):
-        with file.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
-
-        raw_entities = data.get("entities", [])
-        for e in raw_entities:
-            # Parse fields
-            fields = []
-            for fdef in e.get("fields", []):
-                fields.append(
-                    FieldDef(
-                        name=fdef["name"],
-                        type=fdef.get("type"),
-                        required=bool(fdef.get("required", False)),
-                        pii=bool(fdef.get("pii", False)),
-                        description=fdef.get("description"),
-                    )
-                )
+def _load_yaml_file(file: Path) -> List[SchemaEntity]:
+    """Parse one YAML file into SchemaEntity objects."""
+    with file.open("r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=SafeLoader) or {}
 
-            # Create SchemaEntity
-            entity = SchemaEntity(
-                name=e["name"],
-                entity_type=e.get("entity_type", "table"),
-                fields=fields,
-                upstream=e.get("upstream", []),
-                downstream=e.get("downstream", []),
-            )
+    entities: List[SchemaEntity] = []
+    raw_entities = data.get("entities", [])
+    for e in raw_entities:
+        # Validate the raw mapping directly; unknown keys are ignored
+        entity = SchemaEntity.model_validate(e)
 
-            # Initial document text
-            entity.raw_text = entity.to_document_text()
+        # Document text, including the lineage context block
+        entity.raw_text = entity.to_document_text()
 
-            entities.append(entity)
+        entities.append(entity)
 
-    # -----------------------------
-    # SECOND PASS: Build lineage graph context
-    # -----------------------------
-    entity_dict: Dict[str, SchemaEntity] = {e.name: e for e in entities}
+    return entities
 
-    for entity in entities:
-        upstream = entity.upstream or ["None"]
-        downstream = entity.downstream or ["None"]
 
-        impact_text = f"""
-Impact Analysis for {entity.name}:
+def load_yaml_entities(
+    path: str = "data/schemas", max_workers: Optional[int] = None
+) -> EntityRegistry:
+    """
+    Load all SchemaEntity objects from YAML files in the given folder and
+    return them as an EntityRegistry.
 
-Upstream systems: {", ".join(upstream)}
-Downstream systems: {", ".join(downstream)}
+    Files are parsed via src.parallel.map_files (a process pool for large
+    folders).
+    """
+    base = Path(path)
+    # Sorted so duplicate definitions merge in the same order everywhere
+    files = sorted(base.glob("*.yml"))
 
-"""
+    # Load all YAML definitions
+    per_file = map_files(_load_yaml_file, files, max_workers)
 
-        # Append lineage info to raw text for better RAG retrieval
-        entity.raw_text += "\n\n" + impact_text
+    entities: List[SchemaEntity] = [
+        e for file_entities in per_file for e in file_entities
+    ]
 
-    return entities
+    # Index names and lineage adjacency once; closures are walked on demand
+    return EntityRegistry.from_entities(entities)
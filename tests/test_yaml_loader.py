@@ -0,0 +1,14 @@
+from src.yaml_loader import load_yaml_entities
+
+
+def test_duplicate_entity_keeps_fields_and_merges_lineage():
+    registry = load_yaml_entities("data/schemas")
+    customers = registry.by_name["customers"]
+
+    # sample_schema.yml defines the fields; sql_lineage.yml only adds lineage
+    assert len(customers.fields) == 5
+    assert "stg_customers" in customers.upstream
+    assert {"customer_created_event", "customer_orders", "high_value_customers"} <= set(
+        customers.downstream
+    )
+    assert registry.upstream["customers"] == customers.upstream